@@ -9,13 +9,14 @@ What this does
 - Parses rank & suit from URL patterns (e.g., /8D.png, /10CC.webp, queen_of_spades.png).
 - Skips closed/back placeholders (e.g., 1_card_20_20.webp, alt="closed").
 - Saves a clean CSV with a single 'result' column (below7/seven/above7).
-- Runs for MAX_ROUNDS per run (default 20), then exits (for CI schedules).
+- Runs for MAX_ROUNDS per run (default 20) or RUN_SECONDS, whichever comes first, then exits (for CI schedules).
 """
 
-import os, re, csv, time, random
+import os, re, csv, time, math, random, functools
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 
+import soupsieve as sv
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -23,7 +24,7 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 
 # ===================== CONFIG =====================
@@ -38,13 +39,16 @@ if not USERNAME or not PASSWORD:
 CSV_PATH = os.getenv("CSV_PATH", "data/lucky7_data.csv")
 POLL_SEC = float(os.getenv("POLL_SEC", "1.2"))
 ROUND_TIMEOUT = int(os.getenv("ROUND_TIMEOUT", "90"))
+MIN_ROUND_TIMEOUT = int(os.getenv("MIN_ROUND_TIMEOUT", "30"))  # floor once the round cadence is learned; ROUND_TIMEOUT is the ceiling
 MAX_ROUNDS = int(os.getenv("MAX_ROUNDS", "20"))  # collect at least this many rows per run
+RUN_SECONDS = int(os.getenv("RUN_SECONDS", "0"))  # wall-clock budget per run (0 = no limit)
 
 # Non-headless by design; in CI use: xvfb-run -a -s "-screen 0 1600x900x24" python scraper.py
 VISIBLE_BROWSER = True
 
 # ===================== CSV =====================
 HEADERS = ["ts_utc", "round_id", "rank", "suit_key", "color", "result"]
+UTC = timezone.utc
 
 def ensure_csv(path: str):
     d = os.path.dirname(path)
@@ -54,99 +58,151 @@ def ensure_csv(path: str):
         with open(path, "w", newline="", encoding="utf-8") as f:
             csv.DictWriter(f, fieldnames=HEADERS).writeheader()
 
-def append_row(path: str, row: Dict[str, Any]):
-    with open(path, "a", newline="", encoding="utf-8") as f:
-        csv.DictWriter(f, fieldnames=HEADERS).writerow({k: row.get(k) for k in HEADERS})
+class CsvSink:
+    """CSV opened once per run; line-buffered so every row hits the file immediately."""
+    def __init__(self, path: str):
+        ensure_csv(path)
+        self.f = open(path, "a", newline="", encoding="utf-8", buffering=1)
+        self.w = csv.writer(self.f)
+
+    def write(self, row: tuple):
+        """row: values in HEADERS order."""
+        self.w.writerow(row)
+
+    def close(self):
+        self.f.close()
 
 # ===================== Parsing =====================
 RANK_MAP = {"A":1,"2":2,"3":3,"4":4,"5":5,"6":6,"7":7,"8":8,"9":9,"10":10,"J":11,"Q":12,"K":13}
 SUIT_KEY = {"S":"S","H":"H","D":"D","C":"C"}
+RANK_WORD = {"ACE":1,"JACK":11,"QUEEN":12,"KING":13}
+SUIT_WORD = {"SPADE":"S","HEART":"H","DIAMOND":"D","CLUB":"C"}
 
-PAT_SIMPLE = re.compile(r"/(A|K|Q|J|10|[2-9])([SHDC])\.(?:png|jpg|jpeg|webp)\b", re.I)        # /7D.png
-PAT_DOUBLE = re.compile(r"/(A|K|Q|J|10|[2-9])(SS|HH|DD|CC)\.(?:png|jpg|jpeg|webp)\b", re.I)    # /10CC.webp -> C
-PAT_WORDY = re.compile(r"(ace|king|queen|jack|10|[2-9]).*?(spade|heart|diamond|club)s?", re.I) # queen_of_spades.png
-PAT_CLASS  = re.compile(r"rank[-_ ]?(A|K|Q|J|10|[2-9]).*?suit[-_ ]?([shdc])", re.I)            # rank-7 suit-h
+# Single lookup per token, whatever form the site uses (7 / QUEEN, D / DD / DIAMOND)
+RANK_ANY = {**RANK_MAP, **RANK_WORD}
+SUIT_ANY = {**SUIT_KEY, **{s * 2: s for s in SUIT_KEY}, **SUIT_WORD}
+# Every file-name code ("8D", "10CC", "AS") -> (rank, suit) so a filename decodes in one lookup
+CARD_CODES = {r + sk: (rank, s) for r, rank in RANK_MAP.items() for s in SUIT_KEY for sk in (s, s * 2)}
+
+PAT_FILE   = re.compile(r"/(A|K|Q|J|10|[2-9])(SS|HH|DD|CC|[SHDC])\.(?:png|jpg|jpeg|webp)\b", re.I) # /7D.png, /10CC.webp -> C
+PAT_WORDY  = re.compile(r"(ace|king|queen|jack|10|[2-9])[^/]{0,40}?(spade|heart|diamond|club)s?", re.I) # queen_of_spades.png
+PAT_CLASS  = re.compile(r"rank[-_ ]?(A|K|Q|J|10|[2-9])[^\"'<>]{0,30}?suit[-_ ]?([shdc])", re.I)     # rank-7 suit-h
 
 CLOSED_HINTS = ("closed", "back", "backside", "card-back", "1_card_20_20")
+CLOSED_RE = re.compile("|".join(map(re.escape, CLOSED_HINTS)), re.I)
+IMG_EXTS = ("png", "jpg", "jpeg", "webp")
+
+# Folder that served the last /8D.png-style hit; the site uses one CDN path for all faces.
+LEARNED_PREFIX: Optional[str] = None
+
+def parse_learned(url: str) -> Optional[Dict[str,str]]:
+    """Fast path: decode 'RANKSUIT.ext' right after the learned prefix, no regex."""
+    name, _, ext = url[len(LEARNED_PREFIX):].partition(".")
+    low = ext.lower()
+    e = next((e for e in IMG_EXTS if low.startswith(e)), None)
+    if "/" in name or e is None:
+        return None
+    nxt = ext[len(e):len(e) + 1]
+    if nxt.isalnum() or nxt == "_":  # same as PAT_FILE's \b: ".webpx" / ".jpeg2" are not images
+        return None
+    hit = CARD_CODES.get(name.upper())
+    return {"rank": hit[0], "suit_key": hit[1]} if hit else None
+
+def learn_prefix(url: str, m: re.Match):
+    global LEARNED_PREFIX
+    LEARNED_PREFIX = url[:m.start() + 1]
 
+# Same card/back/UI image URLs recur poll after poll; results are pure in the URL.
+@functools.lru_cache(maxsize=4096)
 def parse_from_url(url: str) -> Optional[Dict[str,str]]:
-    low = url.lower()
-    if any(h in low for h in CLOSED_HINTS):
+    if CLOSED_RE.search(url):
         return None
 
-    m = PAT_SIMPLE.search(url)
-    if m:
-        r, s = m.group(1).upper(), m.group(2).upper()
-        return {"rank": RANK_MAP[r], "suit_key": SUIT_KEY[s]}
+    if LEARNED_PREFIX and url.startswith(LEARNED_PREFIX):
+        hit = parse_learned(url)
+        if hit:
+            return hit
 
-    m = PAT_DOUBLE.search(url)
+    m = PAT_FILE.search(url)
     if m:
-        r, ss = m.group(1).upper(), m.group(2).upper()
-        return {"rank": RANK_MAP[r], "suit_key": SUIT_KEY[ss[0]]}
-
-    m = PAT_WORDY.search(url)
-    if m:
-        rtxt, stxt = m.group(1).upper(), m.group(2).upper()
-        rank = RANK_MAP[rtxt] if rtxt in RANK_MAP else int(rtxt)
-        suit = {"SPADE":"S","HEART":"H","DIAMOND":"D","CLUB":"C"}[stxt]
+        learn_prefix(url, m)
+        rank, suit = CARD_CODES[(m.group(1) + m.group(2)).upper()]
         return {"rank": rank, "suit_key": suit}
 
-    m = PAT_CLASS.search(url)
+    m = PAT_WORDY.search(url) or PAT_CLASS.search(url)
     if m:
-        r, s = m.group(1).upper(), m.group(2).upper()
-        return {"rank": RANK_MAP[r], "suit_key": SUIT_KEY[s]}
+        return {"rank": RANK_ANY[m.group(1).upper()], "suit_key": SUIT_ANY[m.group(2).upper()]}
 
     return None
 
+# Lookup tables instead of branches; RESULT_OF is indexed by rank (1..13)
+COLOR_OF = {"H":"red", "D":"red", "S":"black", "C":"black"}
+RESULT_OF = ("",) + ("below7",) * 6 + ("seven",) + ("above7",) * 6
+
 def result_of(rank: int) -> str:
-    if rank < 7: return "below7"
-    if rank == 7: return "seven"
-    return "above7"
+    return RESULT_OF[rank]
 
 # ===================== DOM scraping (DT-style) =====================
+# likely containers: prefer the back face (open side on flip)
+CARD_IMG_QUERIES = (
+    "div.casino-video-cards div.flip-card-back img",
+    "div.flip-card-inner div.flip-card-back img",
+    "div.lucky7-open img",
+    "img.open-card-image",
+    # generic fallbacks:
+    "div.casino-video-cards img",
+    "div.flip-card-container img",
+)
+# compiled once; soup.select(q) would go through soupsieve's pattern cache on every poll
+CARD_IMG_SELECTORS = tuple(sv.compile(q) for q in CARD_IMG_QUERIES)
+
+CARD_SRC_RE = re.compile("card", re.I)
+
 def extract_card_img_urls(html: str) -> list[str]:
     """Prefer open-card images from Lucky 7 DOM; skip closed/back."""
-    soup = BeautifulSoup(html, "html.parser")
-    urls: list[str] = []
-
-    # likely containers: prefer the back face (open side on flip)
-    queries = [
-        "div.casino-video-cards div.flip-card-back img",
-        "div.flip-card-inner div.flip-card-back img",
-        "div.lucky7-open img",
-        "img.open-card-image",
-        # generic fallbacks:
-        "div.casino-video-cards img",
-        "div.flip-card-container img",
-    ]
-    for q in queries:
-        for img in soup.select(q):
+    soup = BeautifulSoup(html, "lxml")
+    urls: Dict[str, None] = {}  # insertion-ordered set
+    add, is_closed = urls.setdefault, CLOSED_RE.search  # bound once for the loops below
+
+    for sel in CARD_IMG_SELECTORS:
+        for img in sel.select(soup):
             src = (img.get("src") or "").strip()
             alt = (img.get("alt") or "").strip().lower()
             if not src:
                 continue
             if alt == "closed":
                 continue
-            if any(h in src.lower() for h in CLOSED_HINTS):
+            if is_closed(src):
                 continue
-            if src not in urls:
-                urls.append(src)
+            add(src)
 
-    # final sweep: any <img> with '/img/cards/' or 'card' in URL
-    for img in soup.find_all("img"):
-        src = (img.get("src") or "").strip()
+    # final sweep: any <img> with 'card' in URL (covers '/img/cards/'); filtered by bs4, not per tag here
+    for img in soup.find_all("img", src=CARD_SRC_RE):
+        src = img["src"].strip()
         if not src:
             continue
-        low = src.lower()
-        if any(h in low for h in CLOSED_HINTS):
+        if is_closed(src):
             continue
-        if "/img/cards/" in low or "card" in low:
-            if src not in urls:
-                urls.append(src)
+        add(src)
+
+    return list(urls)
 
-    return urls
+# Between reveals the frames don't change, so most polls see HTML we already parsed.
+@functools.lru_cache(maxsize=8)
+def card_from_html(html: str) -> Optional[Dict[str,Any]]:
+    # candidates arrive best-first (open-face selectors before the generic sweep)
+    return next(filter(None, map(parse_from_url, extract_card_img_urls(html))), None)
 
 # ===================== Selenium helpers =====================
+# Downloads we never use: webfonts and trackers. Card faces are read from <img src>, and the
+# live video drives the game UI, so images and media are left alone.
+# Note: set on the page's CDP session, so this only covers the top-level document (lobby and
+# same-process frames), not the out-of-process game iframe.
+BLOCKED_URLS = [
+    "*.woff*", "*.ttf*", "*.otf*",  # trailing * so versioned URLs (webfont.woff2?v=4.7.0) match too
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+]
+
 def make_driver():
     opts = Options()
     opts.add_argument("--disable-gpu")
@@ -154,51 +210,102 @@ def make_driver():
     opts.add_argument("--disable-dev-shm-usage")
     opts.add_argument("--window-size=1600,900")
     opts.add_argument("--log-level=3")
-    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
 
 # Increased the default timeout to 60 seconds
 def W(driver, cond, timeout=60):
     return WebDriverWait(driver, timeout).until(cond)
 
+# element_to_be_clickable costs find + is_displayed + is_enabled per poll; this is one round-trip
+JS_CLICKABLE_XPATH = """
+const el = document.evaluate(arguments[0], document, null,
+  XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!el || el.disabled || !el.getClientRects().length) return null;
+return getComputedStyle(el).visibility === 'hidden' ? null : el;
+"""
+
+def W_clickable(driver, xpath: str, timeout=60):
+    return W(driver, lambda d: d.execute_script(JS_CLICKABLE_XPATH, xpath), timeout)
+
+def backoff(attempt: int, base=0.2, cap=POLL_SEC) -> float:
+    """Poll delay: doubles per idle poll up to cap, jittered down by at most 20% (never above cap)."""
+    return min(cap, base * 2 ** min(attempt, 16)) * (0.8 + 0.2 * random.random())
+
 def safe_click(driver, el):
     try:
         el.click()
     except Exception:
         driver.execute_script("arguments[0].click();", el)
 
+FRAME_RESCAN = 10  # consecutive missed polls before re-listing iframes (catches late-inserted frames)
+
+class FrameCache:
+    """Top-level iframe handles, re-listed only after refresh, a stale handle or FRAME_RESCAN misses."""
+    def __init__(self):
+        self.frames: Optional[list] = None
+        self.misses = 0
+
+    def get(self, driver) -> list:
+        # call from default content
+        if self.frames is None or self.misses >= FRAME_RESCAN:
+            self.frames = driver.find_elements(By.TAG_NAME, "iframe")
+            self.misses = 0
+        return self.frames
+
+    def invalidate(self):
+        self.frames = None
+
 # ===================== Site flow =====================
+_UPPER = "translate(., 'abcdefghijklmnopqrstuvwxyz','ABCDEFGHIJKLMNOPQRSTUVWXYZ')"
+XP_CASINO_NAV = "//a[contains(@href, '/casino/') or contains(., 'Casino')]"
+XP_LUCKY7_TAB = f"//a[contains({_UPPER},'LUCKY 7') or contains({_UPPER},'LUCKY7')]"
+XP_LOGIN_LINK = "//a[contains(@class,'auth-link')][translate(normalize-space(.),'LOGIN','login')='login']"
+
+def page_loaded(driver) -> bool:
+    return driver.execute_script("return document.readyState") == "complete"
+
 def login_same_site(driver):
     driver.get(URL)
-    time.sleep(5.0)
-    for link in driver.find_elements(By.CSS_SELECTOR, "a.auth-link.m-r-5"):
-        if link.text.strip().lower() == "login":
-            safe_click(driver, link); break
-    time.sleep(5.0)
     try:
+        # wait for the Login link itself (with its text), not just the first auth link to render
+        safe_click(driver, W_clickable(driver, XP_LOGIN_LINK, 15))
+    except TimeoutException:
+        pass
+    try:
+        # the visibility waits below cover the login form opening
         user_input = W(driver, EC.visibility_of_element_located((By.XPATH, "//input[@name='User Name']")))
         pass_input = W(driver, EC.visibility_of_element_located((By.XPATH, "//input[@name='Password']")))
         user_input.clear(); user_input.send_keys(USERNAME)
         pass_input.clear(); pass_input.send_keys(PASSWORD)
         pass_input.submit()
+        # logged in once the form is gone
+        W(driver, EC.invisibility_of_element_located((By.XPATH, "//input[@name='Password']")), 30)
     except (NoSuchElementException, TimeoutException):
         pass
 
 def click_nav_casino(driver):
-    time.sleep(10.0) # Added explicit wait here
-    el = W(driver, EC.element_to_be_clickable((By.XPATH, "//a[contains(@href, '/casino/') or contains(., 'Casino')]")))
+    try:
+        W(driver, page_loaded, 30)  # post-login redirect settled (was a fixed 10s sleep)
+    except TimeoutException:
+        pass  # slow ads/third-party frames can hold off 'load'; the clickable wait below still gates us
+    el = W_clickable(driver, XP_CASINO_NAV)
+    before = driver.current_url
     safe_click(driver, el)
-    time.sleep(5.0 + random.uniform(0.1,0.4))
+    try:
+        # casino page reached (SPA route change or full navigation) before we look for the Lucky 7 tab
+        W(driver, EC.any_of(EC.url_changes(before), EC.staleness_of(el)), 10)
+    except TimeoutException:
+        pass
 
 def click_lucky7_subtab(driver):
-    el = W(driver, EC.element_to_be_clickable((
-        By.XPATH,
-        "//a[contains(translate(., 'abcdefghijklmnopqrstuvwxyz','ABCDEFGHIJKLMNOPQRSTUVWXYZ'),'LUCKY 7') or "
-        "contains(translate(., 'abcdefghijklmnopqrstuvwxyz','ABCDEFGHIJKLMNOPQRSTUVWXYZ'),'LUCKY7')]"
-    )))
+    el = W_clickable(driver, XP_LUCKY7_TAB)
     safe_click(driver, el)
     time.sleep(5.0 + random.uniform(0.1,0.4))
 
-def click_first_game_in_active_pane(driver):
+def click_first_game_in_active_pane(driver) -> bool:
     try:
         pane = W(driver, EC.visibility_of_element_located((
             By.XPATH, "//*[contains(@class,'tab-pane') and contains(@class,'active')]"
@@ -213,30 +320,54 @@ def click_first_game_in_active_pane(driver):
     if not target:
         raise RuntimeError("No game tiles found in Lucky 7 pane")
     driver.execute_script("arguments[0].scrollIntoView({block:'center'});", target)
+    lobby_url, handles = driver.current_url, len(driver.window_handles)
     time.sleep(2.0 + random.uniform(0.05,0.2)); safe_click(driver, target)
-    time.sleep(5.0)
+    # game opens in a new window or navigates this one
+    try:
+        W(driver, lambda d: len(d.window_handles) > handles or d.current_url != lobby_url, 15)
+    except TimeoutException:
+        pass
     if len(driver.window_handles) > 1:
         driver.switch_to.window(driver.window_handles[-1])
-    time.sleep(5.0)
-    iframes = driver.find_elements(By.TAG_NAME, "iframe")
-    if iframes:
-        driver.switch_to.frame(iframes[0])
-
-def find_round_id_text(driver) -> Optional[str]:
-    for sel in [".round-id", ".casino-round-id", "span.roundId", "div.round-id"]:
-        try:
-            el = driver.find_element(By.CSS_SELECTOR, sel)
-            t = el.text.strip()
-            if t: return t
-        except NoSuchElementException:
-            continue
-    return None
+    try:
+        W(driver, page_loaded, 20)
+        W(driver, EC.frame_to_be_available_and_switch_to_it((By.TAG_NAME, "iframe")), 10)
+        return True
+    except TimeoutException:
+        return False
+
+# in priority order; the first one with non-empty text wins
+ROUND_ID_SELECTORS = [".round-id", ".casino-round-id", "span.roundId", "div.round-id"]
+
+# outermost elements that CARD_IMG_QUERIES are scoped to; only these get serialized when present
+CARD_ROOTS = "div.casino-video-cards, div.flip-card-inner, div.flip-card-container, div.lucky7-open, img.open-card-image"
+
+# One round-trip per context: card-area HTML + round id text (instead of page_source + find_element calls).
+# Falls back to the whole document when no card container exists (lobby, loading screen).
+JS_FRAME_SNAPSHOT = """
+const rid = arguments[0]
+  .map(s => document.querySelector(s))
+  .find(el => el && el.innerText.trim());
+const roots = [...document.querySelectorAll(arguments[1])]
+  .filter(el => !(el.parentElement && el.parentElement.closest(arguments[1])));
+const html = roots.length ? roots.map(el => el.outerHTML).join("") : document.documentElement.outerHTML;
+return [html, rid ? rid.innerText.trim() : null];
+"""
+
+def parse_here(driver) -> Optional[Dict[str,Any]]:
+    """Parse the open card (+ round id) from the current browsing context in one round-trip."""
+    html, rid = driver.execute_script(JS_FRAME_SNAPSHOT, ROUND_ID_SELECTORS, CARD_ROOTS)
+    parsed = card_from_html(html)
+    return {**parsed, "round_id": rid} if parsed else None
 
 # ===================== Main =====================
 def main():
     print(f"CSV → {CSV_PATH}")
+    # 0 means "no limit" for both; one compare each per check
+    deadline = time.time() + RUN_SECONDS if RUN_SECONDS else math.inf
+    max_rows = MAX_ROUNDS or math.inf
     driver = make_driver()
-    ensure_csv(CSV_PATH)
+    sink = CsvSink(CSV_PATH)
 
     try:
         # Login + nav
@@ -244,90 +375,118 @@ def main():
         W(driver, EC.presence_of_element_located((By.TAG_NAME, "body")), 30)
         click_nav_casino(driver)
         click_lucky7_subtab(driver)
-        click_first_game_in_active_pane(driver)
+        # index of the top-level iframe we are in (None = default content)
+        cur_frame = 0 if click_first_game_in_active_pane(driver) else None
 
+        frames = FrameCache()
         last_sig = None
         saved = 0
+        idle = 0  # polls since the last change (new round saved, or open card closed); drives backoff()
+        # refresh after 2.5x the observed round interval (EWMA), kept within [MIN_ROUND_TIMEOUT, ROUND_TIMEOUT]
+        round_timeout, ewma_interval, last_saved_ts = ROUND_TIMEOUT, None, None
 
         while True:
             t0 = time.time()
+            if t0 >= deadline:
+                print(f"Done — run time budget reached, captured {saved} rounds.")
+                break
             parsed = None
+            fresh = True  # we only get here after a hit, so the first miss means the card closed
 
             while not parsed:
                 # Try current context
-                urls = extract_card_img_urls(driver.page_source)
-                for u in urls:
-                    parsed = parse_from_url(u)
-                    if parsed:
-                        break
-
+                parsed = parse_here(driver)
                 if parsed:
                     break
 
-                # Try other iframes depth-1
-                driver.switch_to.default_content()
-                for fr in driver.find_elements(By.TAG_NAME, "iframe"):
-                    try:
-                        driver.switch_to.frame(fr)
-                        urls = extract_card_img_urls(driver.page_source)
-                        for u in urls:
-                            parsed = parse_from_url(u)
+                # Try other iframes depth-1 (the one we were in was just read)
+                if cur_frame is not None:  # already at default content otherwise
+                    driver.switch_to.default_content()
+                try:
+                    for i, fr in enumerate(frames.get(driver)):
+                        if i == cur_frame:
+                            continue
+                        try:
+                            driver.switch_to.frame(fr)
+                            parsed = parse_here(driver)
                             if parsed:
                                 break
-                        if parsed:
-                            break
-                    finally:
-                        driver.switch_to.default_content()
+                        finally:
+                            driver.switch_to.default_content()
+                except StaleElementReferenceException:
+                    frames.invalidate()
+                hit, cur_frame = (i if parsed else None), None
 
                 if parsed:
-                    # Best effort: re-enter first iframe for next cycle
+                    # Best effort: park in the frame that had the card so the next poll reads it first
                     try:
-                        driver.switch_to.frame(driver.find_elements(By.TAG_NAME, "iframe")[0])
+                        driver.switch_to.frame(frames.get(driver)[hit])
+                        cur_frame = hit
                     except Exception:
-                        pass
+                        frames.invalidate()
                     break
+                frames.misses += 1
 
-                if time.time() - t0 > ROUND_TIMEOUT:
+                now = time.time()
+                if now >= deadline:
+                    break
+                if now - t0 > round_timeout:
                     driver.refresh(); time.sleep(10)
-                    ifr = driver.find_elements(By.TAG_NAME, "iframe")
+                    frames.invalidate()
+                    ifr = frames.get(driver)
                     if ifr:
                         driver.switch_to.frame(ifr[0])
+                        cur_frame = 0
                     t0 = time.time()
 
-                time.sleep(1.0 + random.uniform(0.05,0.2))
+                if fresh:
+                    idle, fresh = 0, False  # new round starting: poll fast for the reveal
+                time.sleep(backoff(idle)); idle += 1
+
+            if not parsed:
+                continue  # deadline hit mid-wait; reported at the top of the loop
+            frames.misses = 0  # FRAME_RESCAN counts consecutive misses only
 
-            rid = find_round_id_text(driver)
+            rid = parsed["round_id"]
             rank, suit = parsed["rank"], parsed["suit_key"]
-            res = result_of(rank)
-            row = {
-                "ts_utc": datetime.now(timezone.utc).isoformat(),
-                "round_id": rid,
-                "rank": rank,
-                "suit_key": suit,
-                "color": "red" if suit in ("H","D") else "black",
-                "result": res,
-            }
-
-            # Dedupe by signature
-            sig = f"{rid}|{rank}|{suit}"
+
+            # Dedupe back-to-back reads of the same open card
+            sig = (rid, rank, suit)
             if sig == last_sig:
-                time.sleep(POLL_SEC + random.uniform(0.05,0.2))
+                time.sleep(backoff(idle)); idle += 1
                 continue
             last_sig = sig
+            idle = 0
 
-            append_row(CSV_PATH, row)
+            res = result_of(rank)
+            # same order as HEADERS
+            sink.write((
+                datetime.now(UTC).isoformat(),
+                rid,
+                rank,
+                suit,
+                COLOR_OF[suit],
+                res,
+            ))
             saved += 1
+            now = time.time()
+            if last_saved_ts is not None:
+                dt = now - last_saved_ts
+                ewma_interval = dt if ewma_interval is None else 0.3 * dt + 0.7 * ewma_interval
+                round_timeout = min(ROUND_TIMEOUT, max(MIN_ROUND_TIMEOUT, 2.5 * ewma_interval))
+            last_saved_ts = now
             print(f"Saved {saved}: {rank}{suit} → {res}")
 
-            if MAX_ROUNDS and saved >= MAX_ROUNDS:
+            if saved >= max_rows:
                 print(f"Done — captured {saved} rounds.")
                 break
 
-            time.sleep(POLL_SEC + random.uniform(0.05,0.2))
+            time.sleep(POLL_SEC + 0.05 + 0.15 * random.random())
 
     except KeyboardInterrupt:
         print("Stopped by user")
     finally:
+        sink.close()
         try: driver.quit()
         except Exception: pass
 